@@ -14,76 +14,38 @@ GPIO LED status patterns, and streamlined UI with integrated setup assistant.
 
 import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext
-import subprocess
+from tkinter import font as tkfont
 import threading
+import queue
+import asyncio
 import time
-import json
 import os
-import glob
+from functools import partial
 from datetime import datetime
 
+from platform_manager import get_platform_manager, run_argv, loads, dumps
+
 # Application version
 APP_VERSION = "1.1.0"
 APP_DATE = "2025-08-14"
 
-class PlatformManager:
-    def __init__(self):
-        self.configs = {}
-        self.current_platform = None
-        self.load_platform_configs()
-        
-    def load_platform_configs(self):
-        """Load all platform configuration files"""
-        config_dir = os.path.join(os.path.dirname(__file__), 'configs')
-        if not os.path.exists(config_dir):
-            os.makedirs(config_dir)
-            return
-            
-        for config_file in glob.glob(os.path.join(config_dir, '*.json')):
-            try:
-                with open(config_file, 'r') as f:
-                    config = json.load(f)
-                    platform_id = config.get('platform', os.path.basename(config_file)[:-5])
-                    self.configs[platform_id] = config
-            except Exception as e:
-                print("Error loading config " + config_file + ": " + str(e))
-                
-    def get_platforms(self):
-        """Get list of available platforms"""
-        return [(pid, config['name']) for pid, config in self.configs.items()]
-        
-    def select_platform(self, platform_id):
-        """Select and apply platform configuration"""
-        if platform_id in self.configs:
-            self.current_platform = self.configs[platform_id]
-            return True
-        return False
-        
-    def get_command(self, cmd_name, **kwargs):
-        """Get platform-specific command with parameter substitution"""
-        if not self.current_platform:
-            return None
-            
-        cmd_template = self.current_platform.get('commands', {}).get(cmd_name)
-        if not cmd_template:
-            return None
-            
-        # Add platform-specific parameters
-        params = {
-            'bus': self.current_platform.get('i2c_bus', 1),
-            'addr': 0x49,  # AS7265x address
-            **kwargs
-        }
-        
-        # Add pin numbers
-        pins = self.current_platform.get('pins', {})
-        params.update(pins)
-        
-        try:
-            return cmd_template.format(**params)
-        except KeyError as e:
-            print("Missing parameter for command template: " + str(e))
-            return None
+COMMAND_CACHE_TTL = 2.0
+LOG_FLUSH_MS = 50
+LOG_DRAIN_MAX = 500
+LOG_MAX_LINES = 2000
+LED_FLASH_MS = 100
+RESET_SETTLE_S = 0.5
+TEST_STEPS = 4
+RESULTS_DIR = os.path.expanduser('~/spectral_test_results')
+LOGS_DIR = os.path.expanduser('~/spectral_test_logs')
+LOG_SAVE_CHUNK = 500
+
+def load_results(path):
+    """Yield test records from a JSON-lines results file, one line at a time"""
+    with open(path, 'rb') as f:
+        for line in f:
+            if line.strip():
+                yield loads(line)
 
 class SpectralEvalGUI:
     def __init__(self, root):
@@ -92,46 +54,72 @@ class SpectralEvalGUI:
         self.root.geometry("900x700")
         self.root.configure(bg='#f0f0f0')
         
-        self.platform_manager = PlatformManager()
+        self.platform_manager = get_platform_manager()
         self.testing = False
         self.test_results = []
+        self.test_count = 0
+        self._jsonl = None
+        self._platforms = ()
+        self._cmd_cache = {}
+        self._widget_state = {}
+        self._log_q = queue.Queue()
+        self._log_lines = 0
+        self._ts_cache = (-1, "")
+        
+        # Single worker serializes all hardware and file access off the Tk thread
+        self._jobs = queue.Queue()
+        self._worker = threading.Thread(target=self._worker_loop, daemon=True)
+        self._worker.start()
         
         self.create_widgets()
+        self.root.protocol("WM_DELETE_WINDOW", self.cleanup)
+        self.root.after(LOG_FLUSH_MS, self._drain_log)
         self.populate_platform_selector()
         
     def create_widgets(self):
         """Create GUI widgets"""
+        # Shared font objects; Tk resolves each one once instead of per widget
+        self._f_title = tkfont.Font(family='Arial', size=18, weight='bold')
+        self._f_button = tkfont.Font(family='Arial', size=14, weight='bold')
+        self._f_hdr = tkfont.Font(family='Arial', size=12, weight='bold')
+        self._f_bold = tkfont.Font(family='Arial', size=10, weight='bold')
+        self._f_body = tkfont.Font(family='Arial', size=10)
+        self._f_small = tkfont.Font(family='Arial', size=9)
+        self._f_mono = tkfont.Font(family='Courier', size=9)
+        
+        self._configure_styles()
+        
         # Title frame
-        title_frame = tk.Frame(self.root, bg='#2c3e50', height=100)
+        title_frame = ttk.Frame(self.root, style='Title.TFrame', height=100)
         title_frame.pack(fill='x', padx=10, pady=(10,5))
         title_frame.pack_propagate(False)
         
-        title_label = tk.Label(title_frame, text="AS7265x Spectral Sensor Evaluation Tool", 
-                              font=('Arial', 18, 'bold'), fg='white', bg='#2c3e50')
+        title_label = ttk.Label(title_frame, text="AS7265x Spectral Sensor Evaluation Tool", 
+                               style='Title.TLabel')
         title_label.pack(expand=True)
         
-        version_label = tk.Label(title_frame, text="Version " + APP_VERSION + " - Multi-Platform Support", 
-                               font=('Arial', 10), fg='#bdc3c7', bg='#2c3e50')
+        version_label = ttk.Label(title_frame, text=f"Version {APP_VERSION} - Multi-Platform Support", 
+                                 style='Version.TLabel')
         version_label.pack(side='bottom', pady=(0,5))
         
         # Main content
-        main_frame = tk.Frame(self.root, bg='#f0f0f0')
+        main_frame = ttk.Frame(self.root, style='App.TFrame')
         main_frame.pack(fill='both', expand=True, padx=10, pady=5)
         
         # Left panel
-        left_panel = tk.LabelFrame(main_frame, text="Configuration & Control", 
-                                  font=('Arial', 12, 'bold'), bg='#f0f0f0', pady=10)
+        left_panel = ttk.LabelFrame(main_frame, text="Configuration & Control", 
+                                   style='Panel.TLabelframe', padding=(0,10))
         left_panel.pack(side='left', fill='y', padx=(0,5))
         
         # Platform selection with integrated setup
-        platform_frame = tk.LabelFrame(left_panel, text="Platform", bg='#f0f0f0')
+        platform_frame = ttk.LabelFrame(left_panel, text="Platform", style='App.TLabelframe')
         platform_frame.pack(fill='x', pady=(0,10))
         
         # Platform dropdown with info button
-        platform_select_frame = tk.Frame(platform_frame, bg='#f0f0f0')
+        platform_select_frame = ttk.Frame(platform_frame, style='App.TFrame')
         platform_select_frame.pack(fill='x', padx=5, pady=5)
         
-        tk.Label(platform_select_frame, text="Hardware:", bg='#f0f0f0').pack(side='left')
+        ttk.Label(platform_select_frame, text="Hardware:", style='App.TLabel').pack(side='left')
         self.platform_var = tk.StringVar()
         self.platform_combo = ttk.Combobox(platform_select_frame, textvariable=self.platform_var, 
                                           state='readonly', width=20)
@@ -144,48 +132,47 @@ class SpectralEvalGUI:
         setup_btn.pack(side='right', padx=(5,0))
         
         # Compact platform info (replaces large text box)
-        self.platform_status = tk.Label(platform_frame, text="Select hardware platform", 
-                                       font=('Arial', 9), bg='#f0f0f0', fg='#666', 
-                                       wraplength=200, justify='left')
+        self.platform_status = ttk.Label(platform_frame, text="Select hardware platform", 
+                                        style='Small.TLabel', foreground='#666', 
+                                        wraplength=200, justify='left')
         self.platform_status.pack(fill='x', padx=5, pady=(0,5))
         
         # Connection status
-        status_frame = tk.Frame(left_panel, bg='#f0f0f0')
+        status_frame = ttk.Frame(left_panel, style='App.TFrame')
         status_frame.pack(fill='x', pady=10)
         
-        tk.Label(status_frame, text="Connection Status:", font=('Arial', 10, 'bold'),
-                bg='#f0f0f0').pack()
+        ttk.Label(status_frame, text="Connection Status:", style='Bold.TLabel').pack()
         
-        self.status_label = tk.Label(status_frame, text="Select Platform First", 
-                                   font=('Arial', 10), bg='#f0f0f0', fg='orange')
+        self.status_label = ttk.Label(status_frame, text="Select Platform First", 
+                                     style='App.TLabel', foreground='orange')
         self.status_label.pack()
         
         # Test controls
-        test_frame = tk.LabelFrame(left_panel, text="Test Control", bg='#f0f0f0')
+        test_frame = ttk.LabelFrame(left_panel, text="Test Control", style='App.TLabelframe')
         test_frame.pack(fill='x', pady=10)
         
         self.test_button = tk.Button(test_frame, text="START TEST", 
-                                   command=self.start_test, font=('Arial', 14, 'bold'),
+                                   command=self.start_test, font=self._f_button,
                                    bg='#27ae60', fg='white', height=2, width=15)
         self.test_button.pack(pady=10)
-        self.test_button.config(state='disabled')
+        self._set(self.test_button, state='disabled')
         
-        self.progress = ttk.Progressbar(test_frame, mode='indeterminate')
+        self.progress = ttk.Progressbar(test_frame, mode='determinate',
+                                        maximum=TEST_STEPS)
         self.progress.pack(fill='x', pady=5)
         
         # Test result
-        result_frame = tk.Frame(test_frame, bg='#f0f0f0')
+        result_frame = ttk.Frame(test_frame, style='App.TFrame')
         result_frame.pack(fill='x', pady=5)
         
-        tk.Label(result_frame, text="Test Result:", font=('Arial', 10, 'bold'),
-                bg='#f0f0f0').pack()
+        ttk.Label(result_frame, text="Test Result:", style='Bold.TLabel').pack()
         
-        self.result_label = tk.Label(result_frame, text="Ready", 
-                                   font=('Arial', 12, 'bold'), bg='#f0f0f0', fg='gray')
+        self.result_label = ttk.Label(result_frame, text="Ready", 
+                                     style='Result.TLabel', foreground='gray')
         self.result_label.pack()
         
         # Streamlined actions (removed redundant buttons)
-        actions_frame = tk.LabelFrame(left_panel, text="Actions", bg='#f0f0f0')
+        actions_frame = ttk.LabelFrame(left_panel, text="Actions", style='App.TLabelframe')
         actions_frame.pack(fill='x', pady=10)
         
         tk.Button(actions_frame, text="Test Connection", command=self.test_connection,
@@ -197,52 +184,111 @@ class SpectralEvalGUI:
         tk.Button(actions_frame, text="Save Results", command=self.save_results,
                  bg='#2ecc71', fg='white').pack(fill='x', pady=2)
         
+        tk.Button(actions_frame, text="Export JSON", command=self.export_json,
+                 bg='#16a085', fg='white').pack(fill='x', pady=2)
+        
+        tk.Button(actions_frame, text="Save Log", command=self.save_log,
+                 bg='#7f8c8d', fg='white').pack(fill='x', pady=2)
+        
         # Right panel - Results
-        right_panel = tk.LabelFrame(main_frame, text="Test Results & Log", 
-                                   font=('Arial', 12, 'bold'), bg='#f0f0f0')
+        right_panel = ttk.LabelFrame(main_frame, text="Test Results & Log", 
+                                    style='Panel.TLabelframe')
         right_panel.pack(side='right', fill='both', expand=True, padx=(5,0))
         
+        # No wrapping: Tk re-wraps every line on insert once the log is large
         self.results_text = scrolledtext.ScrolledText(right_panel, height=25, width=60,
-                                                     font=('Courier', 9))
+                                                     font=self._f_mono, wrap='none')
+        # ScrolledText only has a vertical bar; packed ahead of it so it spans the bottom
+        xbar = tk.Scrollbar(self.results_text.frame, orient='horizontal',
+                            command=self.results_text.xview)
+        xbar.pack(side='bottom', fill='x', before=self.results_text.vbar)
+        self.results_text.config(xscrollcommand=xbar.set)
         self.results_text.pack(fill='both', expand=True, pady=10)
         
         # Status bar
-        status_bar = tk.Frame(self.root, bg='#34495e', height=30)
+        status_bar = ttk.Frame(self.root, style='StatusBar.TFrame', height=30)
         status_bar.pack(fill='x', padx=10, pady=(0,10))
         status_bar.pack_propagate(False)
         
-        self.status_bar_label = tk.Label(status_bar, text="Ready - v" + APP_VERSION, 
-                                        fg='white', bg='#34495e')
+        self.status_bar_label = ttk.Label(status_bar, text=f"Ready - v{APP_VERSION}", 
+                                         style='StatusBar.TLabel')
         self.status_bar_label.pack(side='left', padx=10, pady=5)
         
-        self.test_counter_label = tk.Label(status_bar, text="Tests: 0", fg='white', bg='#34495e')
+        self.test_counter_label = ttk.Label(status_bar, text="Tests: 0", style='StatusBar.TLabel')
         self.test_counter_label.pack(side='right', padx=10, pady=5)
         
+    def _configure_styles(self):
+        """Set up the ttk styles shared by all non-interactive widgets"""
+        style = ttk.Style(self.root)
+        style.theme_use('clam')
+        
+        style.configure('App.TFrame', background='#f0f0f0')
+        style.configure('App.TLabel', background='#f0f0f0', font=self._f_body)
+        style.configure('Bold.TLabel', background='#f0f0f0', font=self._f_bold)
+        style.configure('Small.TLabel', background='#f0f0f0', font=self._f_small)
+        style.configure('Result.TLabel', background='#f0f0f0', font=self._f_hdr)
+        style.configure('App.TLabelframe', background='#f0f0f0')
+        style.configure('App.TLabelframe.Label', background='#f0f0f0')
+        style.configure('Panel.TLabelframe', background='#f0f0f0')
+        style.configure('Panel.TLabelframe.Label', background='#f0f0f0', font=self._f_hdr)
+        
+        style.configure('Title.TFrame', background='#2c3e50')
+        style.configure('Title.TLabel', background='#2c3e50', foreground='white', font=self._f_title)
+        style.configure('Version.TLabel', background='#2c3e50', foreground='#bdc3c7', font=self._f_body)
+        
+        style.configure('StatusBar.TFrame', background='#34495e')
+        style.configure('StatusBar.TLabel', background='#34495e', foreground='white')
+        
+    def _set(self, widget, **options):
+        """Configure widget, skipping options that already have that value"""
+        last = self._widget_state.setdefault(widget, {})
+        delta = {k: v for k, v in options.items() if last.get(k) != v}
+        if delta:
+            widget.config(**delta)
+            last.update(delta)
+            
     def populate_platform_selector(self):
         """Populate platform selection dropdown"""
-        platforms = self.platform_manager.get_platforms()
-        if platforms:
-            platform_names = [name for pid, name in platforms]
-            self.platform_combo['values'] = platform_names
+        if self._fill_platform_combo():
             self.platform_combo.current(0)  # Select first platform by default
             self.on_platform_changed()
         else:
             self.log_message("No platform configurations found in configs/ directory", 'ERROR')
             
+    def _fill_platform_combo(self):
+        """Load the manager's platform listing into the dropdown
+        
+        Rows are looked up in the listing kept here, so a config edit that
+        reorders the manager's list can't shift a row onto another platform.
+        """
+        self._platforms = self.platform_manager.get_platforms()
+        self.platform_combo['values'] = [name for pid, name in self._platforms]
+        return bool(self._platforms)
+        
     def on_platform_changed(self, event=None):
         """Handle platform selection change"""
         selection = self.platform_combo.current()
         if selection >= 0:
-            platforms = self.platform_manager.get_platforms()
-            platform_id, platform_name = platforms[selection]
+            platform_id, platform_name = self._platforms[selection]
+            selected = self.platform_manager.select_platform(platform_id)
             
-            if self.platform_manager.select_platform(platform_id):
-                self.log_message("Selected platform: " + platform_name)
+            if self.platform_manager.get_platforms() != self._platforms:
+                # select_platform picked up an edited config; list it afresh
+                self._fill_platform_combo()
+                ids = [pid for pid, name in self._platforms]
+                if selected:
+                    self.platform_combo.current(ids.index(platform_id))
+                else:
+                    self.platform_combo.set('')
+                    
+            if selected:
+                self.clear_command_cache()
+                self.log_message(f"Selected platform: {platform_name}")
                 self.update_platform_info()
-                self.test_button.config(state='normal')
+                self._set(self.test_button, state='normal')
                 self.update_connection_status()
             else:
-                self.log_message("Failed to load platform: " + platform_name, 'ERROR')
+                self.log_message(f"Failed to load platform: {platform_name}", 'ERROR')
                 
     def update_platform_info(self):
         """Update platform information display"""
@@ -253,24 +299,60 @@ class SpectralEvalGUI:
         # Compact status message instead of large text box
         bus = config.get('i2c_bus', 'N/A')
         reset_pin = config.get('pins', {}).get('reset', 'N/A')
-        status_text = "I2C: " + str(bus) + " | Reset: " + str(reset_pin)
+        status_text = f"I2C: {bus} | Reset: {reset_pin}"
+        
+        self._set(self.platform_status, text=status_text, foreground='#2c3e50')
         
-        self.platform_status.config(text=status_text, fg='#2c3e50')
+    def clear_command_cache(self):
+        """Drop cached command results (platform switch, sensor reset)"""
+        self._cmd_cache.clear()
         
-    def run_platform_command(self, cmd_name, **kwargs):
-        """Execute platform-specific command"""
-        cmd = self.platform_manager.get_command(cmd_name, **kwargs)
-        if not cmd:
-            return False, "", "Command not available for platform"
+    async def run_platform_command(self, cmd_name, cache=False, ttl=COMMAND_CACHE_TTL, **kwargs):
+        """Execute platform-specific command (a coroutine for worker-thread jobs)
+        
+        Read-only commands (e.g. i2c_scan) can pass cache=True to reuse a
+        result from the last ttl seconds instead of spawning a new process.
+        """
+        if not cache:
+            return await self._exec_platform_command(cmd_name, **kwargs)
             
-        try:
-            result = subprocess.run(cmd, shell=True, capture_output=True, 
-                                  text=True, timeout=10)
-            return result.returncode == 0, result.stdout.strip(), result.stderr.strip()
-        except subprocess.TimeoutExpired:
-            return False, "", "Command timeout"
-        except Exception as e:
-            return False, "", str(e)
+        key = self._cache_key(cmd_name, kwargs)
+        cached = self._cached_result(key, ttl)
+        if cached:
+            return cached
+            
+        result = await self._exec_platform_command(cmd_name, **kwargs)
+        self._cmd_cache[key] = (time.monotonic(), result)
+        return result
+        
+    def _cache_key(self, cmd_name, kwargs):
+        """Key command results by platform, command and arguments"""
+        return (self.platform_manager.current_platform_id, cmd_name, frozenset(kwargs.items()))
+        
+    def _cached_result(self, key, ttl):
+        """Return a cached command result younger than ttl, if any"""
+        cached = self._cmd_cache.get(key)
+        if cached and time.monotonic() - cached[0] < ttl:
+            return cached[1]
+        return None
+        
+    def _resolve_command(self, cmd_name, kwargs):
+        """Return (direct result, argv); exactly one is set"""
+        result = self.platform_manager.run_direct(cmd_name, **kwargs)
+        if result is not None:
+            return result, None
+            
+        argv = self.platform_manager.get_argv(cmd_name, **kwargs)
+        if not argv:
+            return (False, "", "Command not available for platform"), None
+        return None, argv
+        
+    async def _exec_platform_command(self, cmd_name, **kwargs):
+        """Run platform-specific command in-process or as a subprocess"""
+        result, argv = self._resolve_command(cmd_name, kwargs)
+        if result is not None:
+            return result
+        return await run_argv(argv)
             
     def test_connection(self):
         """Test platform connection and I2C communication"""
@@ -279,44 +361,66 @@ class SpectralEvalGUI:
             return
             
         self.log_message("Testing platform connection...")
-        
-        # Test I2C scan
-        success, stdout, stderr = self.run_platform_command('i2c_scan')
-        if success and "49" in stdout:
+        self.submit_job(lambda: self.run_platform_command('i2c_scan', cache=True),
+                        self._show_connection_result)
+        
+    def _show_connection_result(self, result):
+        """Update connection status from an i2c_scan result"""
+        success, stdout, _ = result or (False, "", "")
+        connected = success and "49" in stdout
+        if connected:
             self.log_message("✓ AS7265x sensor detected at 0x49", 'SUCCESS')
-            self.status_label.config(text="✓ Sensor Connected", fg='green')
         else:
             self.log_message("✗ Sensor not detected on I2C bus", 'ERROR')
-            self.status_label.config(text="✗ No Sensor", fg='red')
+        self._set_connection_status(connected)
+        
+    def _set_connection_status(self, connected):
+        """Show whether the sensor answered on the bus"""
+        if connected:
+            self._set(self.status_label, text="✓ Sensor Connected", foreground='green')
+        else:
+            self._set(self.status_label, text="✗ No Sensor", foreground='red')
             
     def reset_sensor(self):
         """Reset sensor using platform-specific GPIO command"""
         if not self.platform_manager.current_platform:
             return
             
+        reset_pin = self.platform_manager.current_platform['pins']['reset']
         self.log_message("Resetting sensor...")
-        
-        # Reset sequence
-        success1, _, _ = self.run_platform_command('gpio_set_low', pin=self.platform_manager.current_platform['pins']['reset'])
-        time.sleep(0.5)
-        success2, _, _ = self.run_platform_command('gpio_set_high', pin=self.platform_manager.current_platform['pins']['reset'])
-        
-        if success1 and success2:
+        self.submit_job(lambda: self._reset_sequence(reset_pin), self._show_reset_result)
+        
+    async def _reset_sequence(self, reset_pin):
+        """Pulse the reset line low (runs on the worker thread)"""
+        # The 500 ms hold is a minimum, so it only starts once the line is low
+        success1, _, _ = await self.run_platform_command('gpio_set_low', pin=reset_pin)
+        await asyncio.sleep(0.5)
+        success2, _, _ = await self.run_platform_command('gpio_set_high', pin=reset_pin)
+        # Give the sensor time to boot before _show_reset_result probes it
+        await asyncio.sleep(RESET_SETTLE_S)
+        self.clear_command_cache()
+        return success1 and success2
+        
+    def _show_reset_result(self, success):
+        """Report the outcome of a reset sequence"""
+        if success:
             self.log_message("✓ Sensor reset complete", 'SUCCESS')
         else:
             self.log_message("⚠ GPIO reset failed (check permissions)", 'WARNING')
+        # A reset is the one event that can change what's on the bus
+        self.update_connection_status()
             
-    def flash_status_led(self, times=3):
-        """Flash status LED using platform commands"""
+    async def flash_status_led(self, times=3):
+        """Flash status LED using platform commands (on the worker thread)"""
         if not self.platform_manager.current_platform:
             return
             
         led_pin = self.platform_manager.current_platform['pins']['status_led']
         for _ in range(times):
-            self.run_platform_command('gpio_set_high', pin=led_pin)
-            time.sleep(0.1)
-            self.run_platform_command('gpio_set_low', pin=led_pin)
-            time.sleep(0.1)
+            await self.run_platform_command('gpio_set_high', pin=led_pin)
+            await asyncio.sleep(LED_FLASH_MS / 1000)
+            await self.run_platform_command('gpio_set_low', pin=led_pin)
+            await asyncio.sleep(LED_FLASH_MS / 1000)
             
     def show_platform_setup(self):
         """Show platform setup instructions"""
@@ -326,45 +430,85 @@ class SpectralEvalGUI:
             
         config = self.platform_manager.current_platform
         setup_window = tk.Toplevel(self.root)
-        setup_window.title("Platform Setup - " + config['name'])
+        setup_window.title(f"Platform Setup - {config['name']}")
         setup_window.geometry("600x400")
         
         setup_text = scrolledtext.ScrolledText(setup_window, wrap=tk.WORD)
         setup_text.pack(fill='both', expand=True, padx=10, pady=10)
         
-        content = "Setup Instructions for " + config['name'] + "\n"
-        content += "=" * 50 + "\n\n"
-        
-        for step in config.get('setup_instructions', []):
-            content += "• " + step + "\n"
-            
-        content += "\nPin Configuration:\n"
-        for pin_name, pin_num in config.get('pins', {}).items():
-            content += "  " + pin_name + ": " + str(pin_num) + "\n"
-            
-        content += "\nDependencies:\n"
-        deps = config.get('dependencies', {})
-        if 'python_packages' in deps:
-            content += "  Python: " + ", ".join(deps['python_packages']) + "\n"
-        if 'system_packages' in deps:
-            content += "  System: " + ", ".join(deps['system_packages']) + "\n"
-            
-        setup_text.insert(1.0, content)
+        # Single insert while editable, then lock the widget
+        setup_text.config(state='normal')
+        setup_text.insert(1.0, self.platform_manager.get_setup_text())
         setup_text.config(state='disabled')
         
     def update_connection_status(self):
         """Update connection status in background"""
-        def check():
-            self.test_connection()
-            
-        threading.Thread(target=check, daemon=True).start()
+        self.test_connection()
+        
+    def submit_job(self, job, callback=None):
+        """Queue job for the worker thread; callback(result) runs on the Tk thread
+        
+        job may return a coroutine, which is run to completion on the
+        worker's event loop.
+        """
+        self._jobs.put((job, callback))
+        
+    def _worker_loop(self):
+        """Run queued jobs one at a time and hand results back to Tk"""
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        while True:
+            job, callback = self._jobs.get()
+            try:
+                result = job()
+                if asyncio.iscoroutine(result):
+                    result = loop.run_until_complete(result)
+            except Exception as e:
+                self.log_message(f"Background task failed: {e}", 'ERROR')
+                result = None
+            if callback:
+                try:
+                    self.root.after(0, callback, result)
+                except Exception as e:
+                    # Keep the only worker alive; later jobs (and cleanup) need it
+                    print(f"Could not deliver background result: {e}")
         
     def log_message(self, message, level='INFO'):
         """Add message to results display"""
-        timestamp = datetime.now().strftime('%H:%M:%S')
-        self.results_text.insert(tk.END, "[" + timestamp + "] " + message + "\n")
-        self.results_text.see(tk.END)
-        self.root.update()
+        # Safe from any thread; only _drain_log touches the widget
+        self._log_q.put(message)
+        
+    def _drain_log(self):
+        """Move queued log lines into the results display (Tk thread only)"""
+        messages = []
+        try:
+            while len(messages) < LOG_DRAIN_MAX:
+                messages.append(self._log_q.get_nowait())
+        except queue.Empty:
+            pass
+            
+        if messages:
+            # One timestamp per batch; lines are at most LOG_FLUSH_MS old.
+            # Only call into libc when the minute rolls over
+            now = int(time.time())
+            minute, sec = divmod(now, 60)
+            if minute != self._ts_cache[0]:
+                self._ts_cache = (minute, time.strftime('%H:%M', time.localtime(now)))
+            timestamp = f"{self._ts_cache[1]}:{sec:02d}"
+            lines = [f"[{timestamp}] {message}\n" for message in messages]
+            # Only follow the tail if the user hasn't scrolled back to read
+            follow = self.results_text.yview()[1] >= 1.0
+            text = "".join(lines)
+            self.results_text.insert(tk.END, text)
+            # Keep the widget a fixed-size ring so appends don't slow down over
+            # a long session; count lines here rather than asking Tk each time
+            self._log_lines += text.count("\n")
+            if self._log_lines > LOG_MAX_LINES:
+                self.results_text.delete('1.0', f'{self._log_lines - LOG_MAX_LINES + 1}.0')
+                self._log_lines = LOG_MAX_LINES
+            if follow:
+                self.results_text.see(tk.END)
+        self.root.after(LOG_FLUSH_MS, self._drain_log)
         
     def start_test(self):
         """Start sensor test sequence"""
@@ -376,42 +520,81 @@ class SpectralEvalGUI:
             return
             
         self.testing = True
-        self.test_button.config(text="TESTING...", state='disabled', bg='#f39c12')
-        self.progress.start()
+        self._set(self.test_button, text="TESTING...", state='disabled', bg='#f39c12')
+        self._set(self.progress, value=0)
+        self.submit_job(self.run_sensor_test, self._finish_test)
         
-        def test_thread():
-            try:
-                self.run_sensor_test()
-            finally:
-                self.testing = False
-                self.test_button.config(text="START TEST", state='normal', bg='#27ae60')
-                self.progress.stop()
-                
-        threading.Thread(target=test_thread, daemon=True).start()
+    def _finish_test(self, passed):
+        """Restore test controls once the worker finishes a test"""
+        self.testing = False
+        self._set(self.test_button, text="START TEST", state='normal', bg='#27ae60')
+        if passed is not None:
+            self.test_count += 1
+            self._set(self.test_counter_label, text=f"Tests: {self.test_count}")
+        
+    def _show_test_result(self, passed):
+        """Show PASS/FAIL for a completed test"""
+        # The test just scanned the bus, so reuse that instead of re-checking
+        self._set_connection_status(passed)
+        if passed:
+            self._set(self.result_label, text="✓ PASS", foreground='green')
+        else:
+            self._set(self.result_label, text="✗ FAIL", foreground='red')
         
-    def run_sensor_test(self):
-        """Run basic sensor test sequence"""
+    async def run_sensor_test(self):
+        """Run basic sensor test sequence (on the worker thread)"""
         self.log_message("=" * 60)
         self.log_message("STARTING AS7265x SENSOR TEST")
         platform_name = self.platform_manager.current_platform['name']
-        self.log_message("Platform: " + platform_name)
+        self.log_message(f"Platform: {platform_name}")
         self.log_message("=" * 60)
         
         # Flash LED to indicate test start
-        self.flash_status_led(3)
+        await self.flash_status_led(3)
+        self._test_progress(1)
         
         # Basic I2C communication test
-        success, stdout, stderr = self.run_platform_command('i2c_scan')
-        if success and "49" in stdout:
+        success, stdout, stderr = await self.run_platform_command('i2c_scan', cache=True)
+        passed = success and "49" in stdout
+        # Show the verdict right away; the LED pattern below takes a while
+        self.root.after(0, self._show_test_result, passed)
+        self._test_progress(2)
+        if passed:
             self.log_message("✓ I2C communication successful", 'SUCCESS')
-            self.result_label.config(text="✓ PASS", fg='green')
-            self.flash_status_led(5)  # Success pattern
+            await self.flash_status_led(5)  # Success pattern
         else:
             self.log_message("✗ I2C communication failed", 'ERROR')
-            self.result_label.config(text="✗ FAIL", fg='red')
-            self.flash_status_led(2)  # Failure pattern
+            await self.flash_status_led(2)  # Failure pattern
+        self._test_progress(3)
             
+        self._record_result({
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'platform': platform_name,
+            'platform_id': self.platform_manager.current_platform_id,
+            'result': 'PASS' if passed else 'FAIL',
+        })
+        self._test_progress(TEST_STEPS)
         self.log_message("Test complete")
+        return passed
+        
+    def _test_progress(self, step):
+        """Move the progress bar to a test step (safe from the worker thread)"""
+        # Discrete updates instead of an indeterminate animation redrawing every 50 ms
+        self.root.after(0, partial(self._set, self.progress, value=step))
+        
+    def _record_result(self, record):
+        """Append one test record to the session's JSON-lines file"""
+        if self._jsonl is None:
+            os.makedirs(RESULTS_DIR, exist_ok=True)
+            session = datetime.now().strftime("%Y%m%d_%H%M%S")
+            path = os.path.join(RESULTS_DIR, f"session_{session}.jsonl")
+            self._jsonl = open(path, 'ab')
+        # Flushed and synced per record, so a completed test survives a crash
+        # or power loss (SD cards on the Pi cache writes aggressively)
+        self._jsonl.write(dumps(record) + b"\n")
+        self._jsonl.flush()
+        os.fsync(self._jsonl.fileno())
+        self.test_results.append(record)
         
     def save_results(self):
         """Save test results to file"""
@@ -421,15 +604,85 @@ class SpectralEvalGUI:
             
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         platform_name = self.platform_manager.current_platform['name'].replace(' ', '_')
-        filename = "as7265x_test_" + platform_name + "_" + timestamp + ".json"
+        filename = os.path.join(RESULTS_DIR, f"as7265x_test_{platform_name}_{timestamp}.jsonl")
+        
+        def finalize():
+            # Results are already on disk; close the session file and move
+            # it into place. The next test starts a new session.
+            if self._jsonl is None:
+                return "No test results to save"  # Already saved by an earlier job
+            path = self._jsonl.name
+            self._jsonl.close()
+            # Dropped before the move, so a failed replace can't leave later
+            # tests writing to a closed file
+            self._jsonl = None
+            try:
+                os.replace(path, filename)
+                self.test_results = []
+                return None
+            except Exception as e:
+                return str(e)
+                
+        self.submit_job(finalize, lambda error: self._show_save_result(filename, error))
+        
+    def export_json(self):
+        """Export the current session as a pretty-printed JSON array"""
+        if not self.test_results:
+            messagebox.showwarning("Warning", "No test results to export")
+            return
+            
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        platform_name = self.platform_manager.current_platform['name'].replace(' ', '_')
+        filename = os.path.join(RESULTS_DIR, f"as7265x_test_{platform_name}_{timestamp}.json")
         
+        def export():
+            if self._jsonl is None:
+                return "No test results to export"  # Saved while this was queued
+            try:
+                records = list(load_results(self._jsonl.name))
+                with open(filename, 'wb') as f:
+                    f.write(dumps(records, pretty=True))
+                return None
+            except Exception as e:
+                return str(e)
+                
+        self.submit_job(export, lambda error: self._show_save_result(filename, error))
+        
+    def _show_save_result(self, filename, error):
+        """Report the outcome of a results save"""
+        if error:
+            self.log_message(f"Save failed: {error}", 'ERROR')
+            return
+        self.log_message(f"Results saved to: {filename}", 'SUCCESS')
+        messagebox.showinfo("Saved", f"Results saved to:\n{filename}")
+
+    def save_log(self):
+        """Write the log panel to a text file in LOGS_DIR"""
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        filename = os.path.join(LOGS_DIR, f"as7265x_log_{timestamp}.txt")
+        # Tk widgets are Tk-thread only; copy out in chunks rather than one
+        # get('1.0', END) so the whole log is never held twice in memory
+        end_line = int(self.results_text.index('end-1c').split('.')[0])
         try:
+            os.makedirs(LOGS_DIR, exist_ok=True)
             with open(filename, 'w') as f:
-                json.dump(self.test_results, f, indent=2)
-            self.log_message("Results saved to: " + filename, 'SUCCESS')
-            messagebox.showinfo("Saved", "Results saved to:\n" + filename)
-        except Exception as e:
-            self.log_message("Save failed: " + str(e), 'ERROR')
+                for i in range(1, end_line + 1, LOG_SAVE_CHUNK):
+                    f.write(self.results_text.get(f'{i}.0', f'{i + LOG_SAVE_CHUNK}.0'))
+        except OSError as e:
+            self.log_message(f"Log save failed: {e}", 'ERROR')
+            return
+        self.log_message(f"Log saved to: {filename}", 'SUCCESS')
+        
+    def cleanup(self):
+        """Close the results file and hardware handles, then exit"""
+        def close():
+            # Runs on the worker, after any test that is still writing
+            if self._jsonl is not None:
+                self._jsonl.close()
+                self._jsonl = None
+            self.platform_manager.close()
+            
+        self.submit_job(close, lambda _: self.root.destroy())
 
 def main():
     root = tk.Tk()
@@ -4,9 +4,17 @@ Custom Platform Setup Helper
 Interactive tool to create new platform configurations
 """
 
-import json
+import sys
 import os
 
+# Add parent directory to path to import platform manager
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from platform_manager import dumps
+
+# Default platform ID: "BeagleBone Black Rev-C" -> "beaglebone_black_rev_c"
+SLUG_TABLE = str.maketrans(' -.', '___')
+
 def get_user_input(prompt, default=None):
     """Get user input with optional default"""
     if default:
@@ -15,12 +23,30 @@ def get_user_input(prompt, default=None):
     else:
         return input(f"{prompt}: ").strip()
 
+def read_block(prompt):
+    """Read lines until a blank line or EOF, returning them as a list"""
+    print(prompt)
+    lines = []
+    # Iterating stdin reads piped/here-doc input in buffered blocks
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            break
+        lines.append(line)
+    return lines
+
+def parse_pin(value):
+    """Pin numbers become ints; labels like P9_12 stay strings"""
+    try:
+        return int(value)
+    except ValueError:
+        return value
+
 def get_pin_config():
     """Get pin configuration from user"""
     print("\n=== Pin Configuration ===")
     print("Enter pin numbers/names for your platform:")
     
-    pins = {}
     pin_types = [
         ('reset', 'Reset pin (active low)'),
         ('status_led', 'Status LED pin'),
@@ -29,16 +55,24 @@ def get_pin_config():
         ('interrupt', 'Interrupt pin (optional)')
     ]
     
+    # All pins on one line, e.g. reset=17,status_led=27,sda=2,scl=3,interrupt=4;
+    # anything left out is asked for one at a time below
+    line = get_user_input("All pins as name=value,... (blank to enter one by one)")
+    known = [pin_name for pin_name, _ in pin_types]
+    pins = {}
+    for item in filter(None, line.split(',')):
+        pin_name, _, pin_value = (part.strip() for part in item.partition('='))
+        if pin_name not in known:
+            # A typo like "rest=5" must not end up in the saved config
+            print(f"Unknown pin '{pin_name}' ignored (expected: {', '.join(known)})")
+        elif pin_value:
+            pins[pin_name] = parse_pin(pin_value)
+    
     for pin_name, description in pin_types:
-        while True:
+        while pin_name not in pins:
             pin_value = get_user_input(f"{description}")
             if pin_value:
-                # Try to convert to int, otherwise keep as string
-                try:
-                    pins[pin_name] = int(pin_value)
-                except ValueError:
-                    pins[pin_name] = pin_value
-                break
+                pins[pin_name] = parse_pin(pin_value)
             else:
                 print("Pin configuration required!")
                 
@@ -71,9 +105,8 @@ def get_communication_config():
     print("\n=== Communication Configuration ===")
     comm_types = ['direct', 'serial', 'tcp', 'custom']
     
-    print("Communication types:")
-    for i, comm_type in enumerate(comm_types, 1):
-        print(f"{i}. {comm_type}")
+    sys.stdout.write("Communication types:\n" + "".join(
+        f"{i}. {comm_type}\n" for i, comm_type in enumerate(comm_types, 1)))
         
     while True:
         choice = get_user_input("Select communication type (1-4)", "1")
@@ -116,16 +149,7 @@ def get_dependencies():
 def get_setup_instructions():
     """Get setup instructions"""
     print("\n=== Setup Instructions ===")
-    print("Enter setup instructions (one per line, empty line to finish):")
-    
-    instructions = []
-    while True:
-        instruction = input("Step: ").strip()
-        if not instruction:
-            break
-        instructions.append(instruction)
-        
-    return instructions
+    return read_block("Enter setup instructions (one per line, empty line to finish):")
 
 def create_platform_config():
     """Interactive platform configuration creator"""
@@ -137,7 +161,7 @@ def create_platform_config():
     print("\n=== Platform Information ===")
     name = get_user_input("Platform name (e.g., 'Arduino Uno')")
     platform_id = get_user_input("Platform ID (e.g., 'arduino_uno')", 
-                                name.lower().replace(' ', '_'))
+                                name.lower().translate(SLUG_TABLE))
     description = get_user_input("Description", f"{name} with AS7265x support")
     i2c_bus = get_user_input("I2C bus number/name", "1")
     
@@ -171,7 +195,10 @@ def create_platform_config():
         
     # Save configuration
     print("\n=== Configuration Summary ===")
-    print(json.dumps(config, indent=2))
+    # Serialized once (orjson when installed): the same bytes are shown
+    # here and written to disk
+    payload = dumps(config, pretty=True) + b"\n"
+    sys.stdout.write(payload.decode())
     
     save = get_user_input("\nSave this configuration? (y/n)", "y")
     if save.lower() in ['y', 'yes']:
@@ -180,8 +207,20 @@ def create_platform_config():
         os.makedirs(config_dir, exist_ok=True)
         
         filename = os.path.join(config_dir, f"{platform_id}.json")
-        with open(filename, 'w') as f:
-            json.dump(config, f, indent=2)
+        # Write a temp file and rename it over the target, so the GUI never
+        # sees a half-written config
+        tmp = f"{filename}.tmp"
+        try:
+            # File object write() loops until the whole buffer is written
+            with open(tmp, 'wb') as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, filename)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
             
         print(f"Configuration saved to: {filename}")
         print("\nTo use this platform:")
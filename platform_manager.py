@@ -0,0 +1,665 @@
+#!/usr/bin/env python3
+"""
+AS7265x Platform Manager
+Loads platform JSON configs, renders their commands, and drives the
+in-process I2C/GPIO backends
+
+Shared by the GUI (as7265x_tester.py) and the command-line examples.
+"""
+
+import shlex
+import asyncio
+import subprocess
+import threading
+import atexit
+import json
+import os
+import pickle
+import string
+from functools import partial, cache
+
+# Optional in-process hardware backends; platforms fall back to their
+# command templates when these aren't installed
+try:
+    from smbus2 import SMBus
+except ImportError:
+    SMBus = None
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+try:
+    import gpiod
+except ImportError:
+    gpiod = None
+# The gpiod backend uses the libgpiod 1.x API; with the 2.x bindings
+# platforms fall back to their command templates
+if gpiod is not None and not hasattr(gpiod, 'LINE_REQ_DIR_OUT'):
+    gpiod = None
+
+try:
+    import RPi.GPIO as GPIO
+except (ImportError, RuntimeError):
+    GPIO = None
+
+# orjson is several times faster for config loads and result writes;
+# both helpers work on bytes either way
+try:
+    import orjson
+    
+    def loads(data):
+        return orjson.loads(data)
+        
+    def dumps(obj, pretty=False):
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else None)
+except ImportError:
+    def loads(data):
+        return json.loads(data)
+        
+    def dumps(obj, pretty=False):
+        if pretty:
+            return json.dumps(obj, indent=2).encode()
+        return json.dumps(obj, separators=(',', ':')).encode()
+
+# Platform commands are exec'd directly; only templates using shell syntax
+# (redirects, pipes, etc.) get wrapped in /bin/sh
+SHELL_META_CHARS = set('|&;<>()$`*?[]#~')
+AS7265X_ADDR = 0x49
+I2C_SCAN_FIRST = 0x03
+I2C_SCAN_LAST = 0x77
+SYSFS_GPIO_VALUE = '/sys/class/gpio/gpio{}/value'
+I2C_SLAVE = 0x0703  # ioctl from linux/i2c-dev.h
+GPIO_CONSUMER = 'as7265x'
+CONFIG_CACHE_FILE = '.cache.pickle'
+COMMAND_TIMEOUT = 10
+
+_formatter = string.Formatter()
+
+# Parsed configs by path, shared by every PlatformManager in the process
+# (e.g. the GUI and a script importing it), so each file is parsed once per edit
+_cfg_cache = {}
+
+# Compiled templates by text; most platforms share templates like
+# "i2cdetect -y {bus}", and configs are recompiled on every reload
+_tpl_cache = {}
+
+def compile_template(template):
+    """Parse a command template once into (template, field_names)
+    
+    Templates without placeholders are pre-rendered so later calls can
+    return them as-is.
+    """
+    compiled = _tpl_cache.get(template)
+    if compiled is None:
+        parsed = list(_formatter.parse(template))
+        fields = tuple(field for _, field, _, _ in parsed if field is not None)
+        if fields:
+            compiled = (template, fields)
+        else:
+            compiled = ("".join(literal for literal, _, _, _ in parsed), fields)
+        _tpl_cache[template] = compiled
+    return compiled
+
+class DevI2CBus:
+    """Minimal /dev/i2c-N client with the SMBus calls we use
+    
+    Fallback for when smbus2 isn't installed: one open() per bus and plain
+    read()/write() syscalls instead of forking i2cget/i2cset.
+    """
+    def __init__(self, bus_num):
+        self.fd = os.open(f"/dev/i2c-{bus_num}", os.O_RDWR)
+        self._addr = None
+        
+    def _select(self, addr):
+        if addr != self._addr:
+            fcntl.ioctl(self.fd, I2C_SLAVE, addr)
+            self._addr = addr
+            
+    def read_byte(self, addr):
+        self._select(addr)
+        return os.read(self.fd, 1)[0]
+        
+    def read_byte_data(self, addr, reg):
+        self._select(addr)
+        os.write(self.fd, bytes([reg]))
+        return os.read(self.fd, 1)[0]
+        
+    def write_byte_data(self, addr, reg, val):
+        self._select(addr)
+        os.write(self.fd, bytes([reg, val]))
+        
+    def close(self):
+        os.close(self.fd)
+
+# Open I2C bus handles by bus number, shared process-wide so every manager
+# in the process reuses one open()+ioctl per bus
+_bus_cache = {}
+_bus_lock = threading.Lock()
+
+def get_bus(bus_num):
+    """Return the shared handle for an I2C bus, opening it on first use"""
+    with _bus_lock:
+        bus = _bus_cache.get(bus_num)
+        if bus is None:
+            bus = SMBus(bus_num) if SMBus is not None else DevI2CBus(bus_num)
+            _bus_cache[bus_num] = bus
+        return bus
+
+@atexit.register
+def close_buses():
+    """Close every shared I2C bus handle; they reopen on next use"""
+    with _bus_lock:
+        for bus in _bus_cache.values():
+            try:
+                bus.close()
+            except OSError:
+                pass
+        _bus_cache.clear()
+
+async def run_argv(argv, timeout=COMMAND_TIMEOUT):
+    """Run a rendered command as a subprocess without blocking the event loop
+    
+    Returns (success, stdout, stderr) like the in-process backends, with
+    output decoded leniently so a stray non-UTF-8 byte can't raise.
+    """
+    try:
+        proc = await asyncio.create_subprocess_exec(*argv, stdout=subprocess.PIPE,
+                                                    stderr=subprocess.PIPE)
+    except Exception as e:
+        return False, "", str(e)
+        
+    try:
+        stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout)
+    except asyncio.TimeoutError:
+        proc.kill()
+        await proc.communicate()
+        return False, "", "Command timeout"
+    return (proc.returncode == 0, stdout.decode(errors='replace').strip(),
+            stderr.decode(errors='replace').strip())
+
+class PlatformManager:
+    def __init__(self):
+        self.configs = {}
+        self.config_dir = os.path.join(os.path.dirname(__file__), 'configs')
+        self._config_files = {}
+        self._templates = {}
+        self._argv_templates = {}
+        self._base_params = {}
+        self._gpio_outputs = set()
+        self._setup_text_cache = {}
+        self._platforms = ()
+        self._dispatch = {}
+        self._gpio_chips = {}
+        self._gpio_lines = {}
+        # get_platform_manager() hands one instance to every caller, which may
+        # be on different threads; one lock keeps their bus transactions and
+        # line writes from interleaving
+        self._hw_lock = threading.RLock()
+        self.current_platform = None
+        self.current_platform_id = None
+        self.load_platform_configs()
+        
+    def load_platform_configs(self):
+        """Load all platform configuration files"""
+        signature = self._scan_config_dir()
+        if signature is None:
+            os.makedirs(self.config_dir)
+            return
+            
+        # Another PlatformManager in this process may have parsed them already
+        warm = all(_cfg_cache.get(path, (None,))[0] == mtime_ns
+                   for path, mtime_ns in signature.items())
+        if warm or not self._load_config_cache(signature):
+            for path, mtime_ns in signature.items():
+                self._load_config_file(path, mtime_ns)
+            if not warm:
+                self._save_config_cache()
+        self._refresh_platform_list()
+        
+    def _load_config_cache(self, signature):
+        """Restore parsed configs from the pickle cache if no file changed"""
+        cache_path = os.path.join(self.config_dir, CONFIG_CACHE_FILE)
+        try:
+            with open(cache_path, 'rb') as f:
+                cached = pickle.load(f)
+        except Exception:
+            return False
+            
+        if cached.get('signature') != signature:
+            return False
+            
+        self.configs = cached['configs']
+        self._config_files = cached['config_files']
+        for path, (mtime_ns, platform_id) in self._config_files.items():
+            if platform_id:
+                _cfg_cache[path] = (mtime_ns, self.configs[platform_id])
+        for platform_id, config in self.configs.items():
+            self._compile_platform(platform_id, config)
+        return True
+        
+    def _save_config_cache(self):
+        """Write parsed configs so the next start can skip JSON parsing"""
+        cache_path = os.path.join(self.config_dir, CONFIG_CACHE_FILE)
+        cached = {
+            'signature': {path: mtime_ns for path, (mtime_ns, _) in self._config_files.items()},
+            'configs': self.configs,
+            'config_files': self._config_files,
+        }
+        try:
+            with open(cache_path, 'wb') as f:
+                pickle.dump(cached, f, protocol=pickle.HIGHEST_PROTOCOL)
+        except OSError:
+            pass  # Read-only install; just parse again next time
+            
+    def _scan_config_dir(self):
+        """Map each JSON config path to its mtime in one directory pass
+        
+        Returns None if the config directory doesn't exist.
+        """
+        found = {}
+        try:
+            with os.scandir(self.config_dir) as it:
+                for entry in it:
+                    if entry.name.endswith('.json') and entry.is_file():
+                        found[entry.path] = entry.stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+        return found
+        
+    def _load_config_file(self, path, mtime_ns):
+        """Parse a single config file and register its platform"""
+        previous_id = self._config_files.get(path, (None, None))[1]
+        # Remember the mtime even on failure so a broken file isn't retried
+        # until it is edited
+        self._config_files[path] = (mtime_ns, None)
+        platform_id = None
+        try:
+            cached = _cfg_cache.get(path)
+            if cached is not None and cached[0] == mtime_ns:
+                config = cached[1]
+            else:
+                with open(path, 'rb') as f:
+                    config = loads(f.read())
+                _cfg_cache[path] = (mtime_ns, config)
+            platform_id = config.get('platform', os.path.basename(path)[:-5])
+            self._compile_platform(platform_id, config)
+            # Re-assigning an existing id keeps its place in the listing
+            self.configs[platform_id] = config
+            self._config_files[path] = (mtime_ns, platform_id)
+        except Exception as e:
+            platform_id = None
+            print(f"Error loading config {path}: {e}")
+        # An edit may change (or break) the file's platform id
+        if previous_id and previous_id != platform_id:
+            self._forget_platform(previous_id)
+            
+    def _forget_platform(self, platform_id):
+        """Drop a platform and everything compiled from its config"""
+        self.configs.pop(platform_id, None)
+        self._templates.pop(platform_id, None)
+        self._argv_templates.pop(platform_id, None)
+        self._base_params.pop(platform_id, None)
+        self._setup_text_cache.pop(platform_id, None)
+        
+    def _compile_platform(self, platform_id, config):
+        """Pre-parse command templates and fixed parameters for a platform"""
+        templates = {}
+        # argv form of each command: compiled tokens, or None when the
+        # template needs /bin/sh (redirects, pipes, etc.)
+        argv_templates = {}
+        for cmd_name, template in config.get('commands', {}).items():
+            if isinstance(template, list):
+                args = [compile_template(arg) for arg in template]
+                templates[cmd_name] = (args, None)
+                argv_templates[cmd_name] = args
+            elif template:
+                templates[cmd_name] = compile_template(template)
+                if SHELL_META_CHARS.intersection(template):
+                    argv_templates[cmd_name] = None
+                    continue
+                try:
+                    argv_templates[cmd_name] = [compile_template(arg) for arg in shlex.split(template)]
+                except ValueError as e:
+                    print(f"Invalid command template for {cmd_name} on {platform_id}: {e}")
+        self._templates[platform_id] = templates
+        self._argv_templates[platform_id] = argv_templates
+        self._setup_text_cache.pop(platform_id, None)
+        
+        # Fixed parameters shared by every command on this platform
+        self._base_params[platform_id] = {
+            'bus': config.get('i2c_bus', 1),
+            'addr': AS7265X_ADDR,
+            **config.get('pins', {})
+        }
+                
+    def _refresh_platform_list(self):
+        """Rebuild the (platform_id, name) listing after configs change"""
+        self._platforms = tuple((pid, config['name']) for pid, config in self.configs.items())
+        
+    def get_platforms(self):
+        """Get list of available platforms"""
+        return self._platforms
+        
+    def get_setup_text(self):
+        """Render setup instructions for the current platform (cached)"""
+        platform_id = self.current_platform_id
+        text = self._setup_text_cache.get(platform_id)
+        if text is not None:
+            return text
+            
+        config = self.current_platform
+        parts = [f"Setup Instructions for {config['name']}\n", f"{'=' * 50}\n\n"]
+        
+        for step in config.get('setup_instructions', []):
+            parts.append(f"• {step}\n")
+            
+        parts.append("\nPin Configuration:\n")
+        for pin_name, pin_num in config.get('pins', {}).items():
+            parts.append(f"  {pin_name}: {pin_num}\n")
+            
+        parts.append("\nDependencies:\n")
+        deps = config.get('dependencies', {})
+        if 'python_packages' in deps:
+            parts.append(f"  Python: {', '.join(deps['python_packages'])}\n")
+        if 'system_packages' in deps:
+            parts.append(f"  System: {', '.join(deps['system_packages'])}\n")
+            
+        text = "".join(parts)
+        self._setup_text_cache[platform_id] = text
+        return text
+        
+    def select_platform(self, platform_id):
+        """Select and apply platform configuration"""
+        self._refresh_if_edited()
+        if platform_id in self.configs:
+            self.current_platform = self.configs[platform_id]
+            self.current_platform_id = platform_id
+            self._dispatch = self._build_dispatch(self.current_platform)
+            return True
+        if platform_id == self.current_platform_id:
+            # Its file was edited to another platform id (or broken)
+            self.current_platform = None
+            self.current_platform_id = None
+            self._dispatch = {}
+        return False
+        
+    def _refresh_if_edited(self):
+        """Re-parse any known config file edited since it was loaded
+        
+        Goes by path so a file that failed to parse (no platform id) is
+        picked up again once it is fixed.
+        """
+        edited = False
+        for path, (mtime_ns, _) in list(self._config_files.items()):
+            try:
+                current = os.stat(path).st_mtime_ns
+            except OSError:
+                continue  # Removed since load; keep the config already parsed
+            if current != mtime_ns:
+                self._load_config_file(path, current)
+                edited = True
+        if edited:
+            self._save_config_cache()
+            self._refresh_platform_list()
+            
+    def _lookup_command(self, cmd_name, kwargs):
+        """Return (compiled template, substitution params) for a command"""
+        compiled = self._templates[self.current_platform_id].get(cmd_name)
+        if not compiled:
+            return None, None
+            
+        base = self._base_params[self.current_platform_id]
+        params = {**base, **kwargs} if kwargs else base
+        return compiled, params
+        
+    @staticmethod
+    def _render(compiled, params):
+        """Substitute params into a compiled template"""
+        template, fields = compiled
+        return template.format_map(params) if fields else template
+        
+    def get_command(self, cmd_name, **kwargs):
+        """Get platform-specific command with parameter substitution"""
+        if not self.current_platform:
+            return None
+            
+        compiled, params = self._lookup_command(cmd_name, kwargs)
+        if not compiled:
+            return None
+            
+        try:
+            if isinstance(compiled[0], list):
+                return shlex.join(self._render(arg, params) for arg in compiled[0])
+            return self._render(compiled, params)
+        except KeyError as e:
+            print(f"Missing parameter for command template: {e}")
+            return None
+            
+    def get_argv(self, cmd_name, **kwargs):
+        """Get platform-specific command as an argv list (no shell needed)"""
+        if not self.current_platform:
+            return None
+            
+        compiled, params = self._lookup_command(cmd_name, kwargs)
+        if not compiled:
+            return None
+            
+        argv_templates = self._argv_templates[self.current_platform_id]
+        if cmd_name not in argv_templates:
+            return None  # Unsplittable template, reported at load time
+            
+        # Split once at load time; each token is formatted on its own, so a
+        # substituted value can never turn into extra arguments
+        args = argv_templates[cmd_name]
+        try:
+            if args is None:
+                # e.g. sysfs "echo 1 > /sys/class/gpio/..." needs a real shell
+                return ['/bin/sh', '-c', self._render(compiled, params)]
+            return [self._render(arg, params) for arg in args]
+        except KeyError as e:
+            print(f"Missing parameter for command template: {e}")
+            return None
+            
+    def run_direct(self, cmd_name, **kwargs):
+        """Run a command through an in-process backend if the platform has one
+        
+        Returns (success, stdout, stderr), or None when the command should
+        go through the platform's command template instead.
+        """
+        handler = self._dispatch.get(cmd_name)
+        if handler is None:
+            return None
+        with self._hw_lock:
+            return handler(**kwargs)
+            
+    def scan_i2c(self, wanted=None):
+        """Sweep the current platform's I2C bus in-process
+        
+        Returns the set of responding addresses, or None when the platform
+        has no in-process I2C backend and the i2c_scan command must be used.
+        If wanted is given it is probed first, and the sweep is skipped when
+        it answers; leave it out for a full diagnostic scan.
+        """
+        if 'i2c_scan' not in self._dispatch:
+            return None
+            
+        found = set()
+        with self._hw_lock:
+            bus_num = self._base_params[self.current_platform_id]['bus']
+            try:
+                bus = get_bus(bus_num)
+            except OSError as e:
+                # Missing /dev/i2c-N or no permission, not an empty bus
+                print(f"Could not open I2C bus {bus_num}: {e}")
+                return found
+            if wanted is not None:
+                try:
+                    bus.read_byte(wanted)
+                    return {wanted}
+                except OSError:
+                    pass
+            for addr in range(I2C_SCAN_FIRST, I2C_SCAN_LAST + 1):
+                try:
+                    bus.read_byte(addr)
+                    found.add(addr)
+                except OSError:
+                    pass
+        return found
+        
+    def _build_dispatch(self, config):
+        """Map command names to in-process handlers for the platform's backends"""
+        dispatch = {}
+        
+        bus = config.get('i2c_bus', 1)
+        if config.get('i2c_backend') == 'smbus2' and (SMBus is not None or fcntl is not None):
+            dispatch['i2c_scan'] = partial(self._smbus_probe, bus)
+            dispatch['i2c_read'] = partial(self._smbus_read, bus)
+            dispatch['i2c_write'] = partial(self._smbus_write, bus)
+            
+        gpio_backend = config.get('gpio_backend')
+        if gpio_backend == 'gpiod' and gpiod is not None:
+            chip_name = config.get('gpio_chip', 'gpiochip0')
+            self._gpiod_request_test_lines(chip_name, config.get('pins', {}))
+            dispatch['gpio_set_high'] = partial(self._gpiod_write, chip_name, value=1)
+            dispatch['gpio_set_low'] = partial(self._gpiod_write, chip_name, value=0)
+            dispatch['gpio_get'] = partial(self._gpiod_read, chip_name)
+        elif gpio_backend == 'RPi.GPIO' and GPIO is not None:
+            dispatch['gpio_set_high'] = partial(self._rpi_gpio_write, value=True)
+            dispatch['gpio_set_low'] = partial(self._rpi_gpio_write, value=False)
+        elif gpio_backend == 'sysfs':
+            # Board pin labels (e.g. BeagleBone P9_12) map to kernel GPIO numbers
+            pin_mapping = config.get('pin_mapping', {})
+            dispatch['gpio_set_high'] = partial(self._sysfs_gpio_write, pin_mapping, value=1)
+            dispatch['gpio_set_low'] = partial(self._sysfs_gpio_write, pin_mapping, value=0)
+            dispatch['gpio_get'] = partial(self._sysfs_gpio_read, pin_mapping)
+            
+        return dispatch
+        
+    def close(self):
+        """Release hardware handles held by in-process backends"""
+        with self._hw_lock:
+            close_buses()
+            for line in self._gpio_lines.values():
+                line.release()
+            self._gpio_lines.clear()
+            for chip in self._gpio_chips.values():
+                chip.close()
+            self._gpio_chips.clear()
+        
+    def _smbus_probe(self, bus_num):
+        """Probe the AS7265x address with a single-byte read"""
+        try:
+            get_bus(bus_num).read_byte(AS7265X_ADDR)
+            return True, f"{AS7265X_ADDR:02x}", ""
+        except OSError as e:
+            return False, "", str(e)
+            
+    def _smbus_read(self, bus_num, reg, addr=AS7265X_ADDR):
+        """Read one register, formatted like i2cget output"""
+        try:
+            value = get_bus(bus_num).read_byte_data(addr, reg)
+            return True, f"0x{value:02x}", ""
+        except OSError as e:
+            return False, "", str(e)
+            
+    def _smbus_write(self, bus_num, reg, val, addr=AS7265X_ADDR):
+        """Write one register"""
+        try:
+            get_bus(bus_num).write_byte_data(addr, reg, val)
+            return True, "", ""
+        except OSError as e:
+            return False, "", str(e)
+            
+    def _gpiod_chip(self, chip_name):
+        """Return the open gpiod chip, opening it on first use"""
+        chip = self._gpio_chips.get(chip_name)
+        if chip is None:
+            chip = gpiod.Chip(chip_name)
+            self._gpio_chips[chip_name] = chip
+        return chip
+        
+    def _gpiod_request_test_lines(self, chip_name, pins):
+        """Request the status LED and reset lines when a platform is selected
+        
+        Requested up front at their idle levels (LED off, reset released),
+        so the first flash or reset doesn't pay for it. Each line gets its
+        own handle: libgpiod 1.x writes every line of a bulk handle at once,
+        so a shared one would pull reset low on each LED write.
+        """
+        idle = {pins.get('status_led'): 0, pins.get('reset'): 1}
+        with self._hw_lock:
+            for pin, level in idle.items():
+                if not isinstance(pin, int):
+                    continue
+                try:
+                    self._gpiod_line(chip_name, pin, default=level)
+                except OSError as e:
+                    # Busy or missing line; _gpiod_write retries on first use
+                    print(f"Could not request GPIO line {pin}: {e}")
+                
+    def _gpiod_line(self, chip_name, pin, default=0):
+        """Return a requested output line, requesting it on first use"""
+        line = self._gpio_lines.get((chip_name, pin))
+        if line is None:
+            line = self._gpiod_chip(chip_name).get_line(pin)
+            line.request(consumer=GPIO_CONSUMER, type=gpiod.LINE_REQ_DIR_OUT,
+                         default_vals=[default])
+            self._gpio_lines[(chip_name, pin)] = line
+        return line
+        
+    def _gpiod_write(self, chip_name, pin, value):
+        """Drive a GPIO output through libgpiod"""
+        try:
+            self._gpiod_line(chip_name, pin).set_value(value)
+            return True, "", ""
+        except OSError as e:
+            return False, "", str(e)
+            
+    def _gpiod_read(self, chip_name, pin):
+        """Read back a GPIO line through libgpiod"""
+        try:
+            return True, str(self._gpiod_line(chip_name, pin).get_value()), ""
+        except OSError as e:
+            return False, "", str(e)
+            
+    def _sysfs_gpio_write(self, pin_mapping, pin, value):
+        """Drive an exported GPIO through /sys/class/gpio"""
+        try:
+            with open(SYSFS_GPIO_VALUE.format(pin_mapping.get(pin, pin)), 'w') as f:
+                f.write(str(value))
+            return True, "", ""
+        except OSError as e:
+            return False, "", str(e)
+            
+    def _sysfs_gpio_read(self, pin_mapping, pin):
+        """Read an exported GPIO through /sys/class/gpio"""
+        try:
+            with open(SYSFS_GPIO_VALUE.format(pin_mapping.get(pin, pin)), 'r') as f:
+                return True, f.read().strip(), ""
+        except OSError as e:
+            return False, "", str(e)
+            
+    def _rpi_gpio_write(self, pin, value):
+        """Drive a GPIO output through RPi.GPIO (BCM numbering)"""
+        try:
+            if pin not in self._gpio_outputs:
+                GPIO.setwarnings(False)
+                GPIO.setmode(GPIO.BCM)
+                GPIO.setup(pin, GPIO.OUT)
+                self._gpio_outputs.add(pin)
+            GPIO.output(pin, GPIO.HIGH if value else GPIO.LOW)
+            return True, "", ""
+        except Exception as e:
+            return False, "", str(e)
+
+@cache
+def get_platform_manager():
+    """Shared PlatformManager for the process, created on first use
+    
+    To pick up added or removed config files, close() the current one
+    first (it holds the GPIO lines a new one would request), then call
+    get_platform_manager.cache_clear().
+    """
+    return PlatformManager()